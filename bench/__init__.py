@@ -0,0 +1,4 @@
+"""
+Воспроизводимые замеры масштабируемости task1–task4.
+Запуск из корня репозитория: python -m bench.run --help
+"""
@@ -0,0 +1,132 @@
+# file: generators.py
+"""
+Генераторы синтетических входов для task1–task4.
+Все генераторы детерминированы при фиксированном seed.
+"""
+import json
+import random
+from typing import Any, Dict, List, Tuple
+
+TEMP_VAR = "температура"
+HEAT_VAR = "уровень нагрева"
+
+
+def _edges_to_csv(edges: List[Tuple[int, int]]) -> str:
+    return "\n".join(f"{p},{c}" for p, c in edges)
+
+
+def random_tree(n: int, seed: int = 0) -> Tuple[str, str]:
+    """
+    Случайное дерево на вершинах 1..n: родитель вершины i выбирается
+    равномерно среди 1..i-1. Возвращает (CSV ребер, корень).
+    """
+    rnd = random.Random(seed)
+    edges = [(rnd.randint(1, i - 1), i) for i in range(2, n + 1)]
+    return _edges_to_csv(edges), "1"
+
+
+def chain_tree(n: int, seed: int = 0) -> Tuple[str, str]:
+    """
+    Цепочка 1 -> 2 -> ... -> n (максимальная глубина). seed не используется.
+    """
+    edges = [(i - 1, i) for i in range(2, n + 1)]
+    return _edges_to_csv(edges), "1"
+
+
+def fan_tree(n: int, seed: int = 0) -> Tuple[str, str]:
+    """
+    Корень 1 и n - 1 листьев (максимальная ширина). seed не используется.
+    """
+    edges = [(1, i) for i in range(2, n + 1)]
+    return _edges_to_csv(edges), "1"
+
+
+TREES = {
+    "random": random_tree,
+    "chain": chain_tree,
+    "fan": fan_tree,
+}
+
+
+def _random_clusters(items: List[int], rnd: random.Random, max_cluster: int) -> List[List[int]]:
+    clusters = []
+    i = 0
+    while i < len(items):
+        k = rnd.randint(1, max_cluster)
+        clusters.append(items[i:i + k])
+        i += k
+    return clusters
+
+
+def _to_json_ranking(clusters: List[List[int]]) -> str:
+    return json.dumps([cl if len(cl) > 1 else cl[0] for cl in clusters if cl])
+
+
+def ranking_pair(n: int, disagreement: float = 0.1, seed: int = 0,
+                 max_cluster: int = 3) -> Tuple[str, str]:
+    """
+    Пара кластерных ранжировок объектов 1..n в JSON.
+    Вторая получается из первой переносом доли disagreement объектов
+    в случайные кластеры.
+    """
+    if not 0.0 <= disagreement <= 1.0:
+        raise ValueError("disagreement должен быть в [0, 1]")
+    rnd = random.Random(seed)
+    items = list(range(1, n + 1))
+    rnd.shuffle(items)
+    first = _random_clusters(items, rnd, max_cluster)
+
+    second = [cl[:] for cl in first]
+    for x in rnd.sample(items, round(n * disagreement)):
+        for cl in second:
+            if x in cl:
+                cl.remove(x)
+                break
+        second = [cl for cl in second if cl]
+        idx = rnd.randint(0, len(second))
+        if idx == len(second) or rnd.random() < 0.5:
+            second.insert(idx, [x])
+        else:
+            second[idx].append(x)
+
+    return _to_json_ranking(first), _to_json_ranking(second)
+
+
+def _trapezoids(var: str, prefix: str, count: int, lo: float, hi: float,
+                rnd: random.Random) -> Dict[str, Any]:
+    width = (hi - lo) / count
+    terms = []
+    for i in range(count):
+        a = lo + width * i
+        b = a + width * rnd.uniform(0.1, 0.4)
+        c = a + width * rnd.uniform(0.6, 0.9)
+        d = min(hi, a + width * 1.5)
+        terms.append({"id": f"{prefix}{i}", "points": [[a, 0], [b, 1], [c, 1], [d, 0]]})
+    return {var: terms}
+
+
+def rulebase(n_rules: int, seed: int = 0) -> Tuple[Dict[str, Any], Dict[str, Any], List[List[str]]]:
+    """
+    Нечеткие переменные и база правил для task4.main: n_rules термов температуры
+    (0..50), столько же термов нагрева (0..26) и по одному правилу на терм
+    температуры со случайным следствием.
+    Возвращает (temperature, heating, rules).
+    """
+    rnd = random.Random(seed)
+    temp = _trapezoids(TEMP_VAR, "t", n_rules, 0.0, 50.0, rnd)
+    heat = _trapezoids(HEAT_VAR, "h", n_rules, 0.0, 26.0, rnd)
+    rules = [[f"t{i}", f"h{rnd.randrange(n_rules)}"] for i in range(n_rules)]
+    return temp, heat, rules
+
+
+def readings(count: int, seed: int = 0, lo: float = 0.0, hi: float = 50.0) -> List[float]:
+    """
+    Поток показаний температуры: случайное блуждание в [lo, hi].
+    """
+    rnd = random.Random(seed)
+    t = rnd.uniform(lo, hi)
+    out = []
+    for _ in range(count):
+        t = min(hi, max(lo, t + rnd.gauss(0.0, 1.5)))
+        out.append(round(t, 2))
+    return out
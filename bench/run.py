@@ -0,0 +1,171 @@
+# file: run.py
+"""
+Замеры времени и пиковой памяти task1–task4 на синтетических входах.
+
+Примеры:
+    python -m bench.run --output bench.json
+    python -m bench.run --tasks task3 --sizes 10,20,40 --compare bench.json
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from bench import generators
+from tools.loader import load_task
+
+DEFAULT_SIZES = {
+    "task1": [50, 100, 200, 400],
+    "task2": [50, 100, 200, 400],
+    "task3": [10, 20, 40, 80],
+    "task4": [3, 6, 12, 24],
+}
+
+
+def _cases(task: str, n: int, seed: int, readings: int) -> Dict[str, Callable[[], Any]]:
+    """
+    Сценарии для задачи task размера n: имя сценария -> вызов без аргументов.
+    Входы генерируются заранее, чтобы в замер попадала только main.
+    """
+    module = load_task(task)
+    cases: Dict[str, Callable[[], Any]] = {}
+
+    if task in ("task1", "task2"):
+        for kind, gen in generators.TREES.items():
+            s, e = gen(n, seed)
+            cases[kind] = lambda s=s, e=e: module.main(s, e)
+    elif task == "task3":
+        for disagreement in (0.0, 0.1, 0.5):
+            a, b = generators.ranking_pair(n, disagreement, seed)
+            cases[f"disagreement={disagreement}"] = lambda a=a, b=b: module.main(a, b)
+    elif task == "task4":
+        temp, heat, rules = generators.rulebase(n, seed)
+        stream = generators.readings(readings, seed)
+
+        def run_stream():
+            for t in stream:
+                module.main(temp, heat, rules, t)
+
+        cases[f"readings={readings}"] = run_stream
+    else:
+        raise ValueError(f"Неизвестная задача: {task!r}")
+    return cases
+
+
+def measure(fn: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    """
+    repeat замеров времени (perf_counter) и один отдельный прогон
+    под tracemalloc для пиковой памяти – он заметно замедляет код,
+    поэтому в замеры времени не входит.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "times_s": times,
+        "min_s": min(times),
+        "median_s": statistics.median(times),
+        "peak_bytes": peak,
+    }
+
+
+def run(tasks: Sequence[str], sizes: Optional[Sequence[int]] = None, repeat: int = 3,
+        seed: int = 0, readings: int = 20, log=None) -> Dict[str, Any]:
+    """
+    Прогоняет все сценарии для каждой задачи и размера.
+    sizes=None – размеры по умолчанию из DEFAULT_SIZES для каждой задачи.
+    """
+    results: List[Dict[str, Any]] = []
+    for task in tasks:
+        for n in (sizes or DEFAULT_SIZES[task]):
+            for case, fn in _cases(task, n, seed, readings).items():
+                row = {"task": task, "case": case, "n": n}
+                row.update(measure(fn, repeat))
+                results.append(row)
+                if log is not None:
+                    print(f"{task:6} {case:20} n={n:<6} median={row['median_s']:.4f}s "
+                          f"peak={row['peak_bytes'] / 1024:.0f}KiB", file=log)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": seed,
+            "repeat": repeat,
+            "readings": readings,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any],
+            threshold: float = 1.2) -> List[Dict[str, Any]]:
+    """
+    Сравнивает медианы времени и пиковую память с baseline по совпадающим
+    (task, case, n). Возвращает строки с отношениями; regression=True,
+    если какое-то отношение больше threshold.
+    """
+    base = {(r["task"], r["case"], r["n"]): r for r in baseline["results"]}
+    rows = []
+    for r in current["results"]:
+        b = base.get((r["task"], r["case"], r["n"]))
+        if b is None:
+            continue
+        time_ratio = r["median_s"] / b["median_s"] if b["median_s"] > 0 else float("inf")
+        mem_ratio = r["peak_bytes"] / b["peak_bytes"] if b["peak_bytes"] > 0 else float("inf")
+        rows.append({
+            "task": r["task"], "case": r["case"], "n": r["n"],
+            "time_ratio": time_ratio, "mem_ratio": mem_ratio,
+            "regression": time_ratio > threshold or mem_ratio > threshold,
+        })
+    return rows
+
+
+def _int_list(text: str) -> List[int]:
+    return [int(x) for x in text.split(",") if x]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Замеры task1–task4")
+    parser.add_argument("--tasks", default="task1,task2,task3,task4")
+    parser.add_argument("--sizes", type=_int_list, default=None,
+                        help="размеры через запятую (по умолчанию свои для каждой задачи)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--readings", type=int, default=20,
+                        help="длина потока показаний для task4")
+    parser.add_argument("--output", help="файл для результатов в JSON")
+    parser.add_argument("--compare", help="JSON предыдущего прогона для сравнения")
+    parser.add_argument("--threshold", type=float, default=1.2)
+    args = parser.parse_args()
+
+    report = run(args.tasks.split(","), args.sizes, args.repeat, args.seed,
+                 args.readings, log=sys.stderr)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = compare(report, baseline, args.threshold)
+        for row in rows:
+            mark = "REGRESSION" if row["regression"] else "ok"
+            print(f"{row['task']:6} {row['case']:20} n={row['n']:<6} "
+                  f"time x{row['time_ratio']:.2f} mem x{row['mem_ratio']:.2f} {mark}")
+        if any(row["regression"] for row in rows):
+            sys.exit(1)
@@ -1,7 +1,67 @@
-from typing import List, Tuple
+from typing import Dict, List, Set, Tuple
 import csv
+import json
+import os
+import shutil
+import tempfile
 from io import StringIO
 
+RELATION_NAMES = ("r1", "r2", "r3", "r4", "r5")
+META_FILE = "meta.json"
+
+# Необязательные замеры стадий main, см. tools/profiling.py.
+_profiler = None
+
+
+class _NoProbe:
+    def stage(self, name):
+        pass
+
+    def size(self, **sizes):
+        pass
+
+    def done(self):
+        pass
+
+
+_NO_PROBE = _NoProbe()
+
+
+def _parse_edges(s: str) -> Tuple[List[Tuple[str, str]], List[str]]:
+    """
+    Разбирает CSV-строку с ребрами и возвращает список ребер
+    и отсортированный список вершин (порядок задает индексы в матрицах).
+    """
+    reader = csv.reader(StringIO(s.strip()))
+    edges = []
+    vertices = set()
+
+    for row in reader:
+        if len(row) == 2:
+            parent, child = row[0].strip(), row[1].strip()
+            edges.append((parent, child))
+            vertices.add(parent)
+            vertices.add(child)
+
+    return edges, sorted(vertices)
+
+
+def _topological_order(children: List[Set[int]], parents: List[Set[int]]) -> List[int]:
+    """
+    Топологический порядок вершин (алгоритм Кана).
+    """
+    indeg = [len(ps) for ps in parents]
+    order = [v for v, d in enumerate(indeg) if d == 0]
+    for v in order:
+        for c in children[v]:
+            indeg[c] -= 1
+            if indeg[c] == 0:
+                order.append(c)
+    if len(order) != len(parents):
+        raise ValueError("Граф содержит цикл: ожидалось дерево или DAG")
+    return order
+
+
 def main(s: str, e: str) -> Tuple[
     List[List[bool]],
     List[List[bool]],
@@ -10,8 +70,8 @@ def main(s: str, e: str) -> Tuple[
     List[List[bool]]
 ]:
     """
-    Обрабатывает CSV-строку с ребрами ориентированного дерева и возвращает матрицы смежности
-    для пяти иерархических отношений.
+    Обрабатывает CSV-строку с ребрами ориентированного дерева (или DAG, где у вершины
+    несколько родителей) и возвращает матрицы смежности для пяти иерархических отношений.
 
     Args:
         s: CSV-строка, содержащая список ребер в формате "parent,child\nparent,child\n..."
@@ -25,21 +85,15 @@ def main(s: str, e: str) -> Tuple[
         r4
         r5
     """
-    # Парсим CSV-строку
-    reader = csv.reader(StringIO(s.strip()))
-    edges = []
-    vertices = set()
+    probe = _profiler("task1") if _profiler is not None else _NO_PROBE
 
-    for row in reader:
-        if len(row) == 2:
-            parent, child = row[0].strip(), row[1].strip()
-            edges.append((parent, child))
-            vertices.add(parent)
-            vertices.add(child)
+    # Парсим CSV-строку
+    edges, vertex_list = _parse_edges(s)
+    probe.stage("parse")
 
     # Список вершин и их индексы
-    vertex_list = sorted(vertices)
     n = len(vertex_list)
+    probe.size(n=n, edges=len(edges))
     vertex_to_index = {v: i for i, v in enumerate(vertex_list)}
 
     r1 = [[False]*n for _ in range(n)]
@@ -48,11 +102,12 @@ def main(s: str, e: str) -> Tuple[
     r4 = [[False]*n for _ in range(n)]
     r5 = [[False]*n for _ in range(n)]
 
-    children = {v: [] for v in vertices}
-    parents = {v: None for v in vertices}
+    children = [set() for _ in range(n)]
+    parents = [set() for _ in range(n)]
     for parent, child in edges:
-        children[parent].append(child)
-        parents[child] = parent
+        i, j = vertex_to_index[parent], vertex_to_index[child]
+        children[i].add(j)
+        parents[j].add(i)
 
     # r1
     for parent, child in edges:
@@ -64,53 +119,167 @@ def main(s: str, e: str) -> Tuple[
         i, j = vertex_to_index[parent], vertex_to_index[child]
         r2[j][i] = True
 
-    def get_all_descendants(node, visited=None):
-        if visited is None:
-            visited = set()
-        if node in visited:
-            return set()
-        visited.add(node)
-        result = set()
-        for c in children[node]:
-            result.add(c)
-            result |= get_all_descendants(c, visited)
-        return result
-
-    # r3
-    for v in vertices:
-        i = vertex_to_index[v]
-        for desc in get_all_descendants(v):
-            j = vertex_to_index[desc]
-            r3[i][j] = True
-
-    # r4
-    for v in vertices:
-        j = vertex_to_index[v]
-        curr = parents[v]
-        while curr is not None:
-            i = vertex_to_index[curr]
-            r4[j][i] = True
-            curr = parents[curr]
-
-    # r5
-    siblings = {}
-    for v in vertices:
-        p = parents[v]
-        if p is not None:
-            siblings.setdefault(p, []).append(v)
-    for group in siblings.values():
+    # r3: потомки – битовые маски по индексам вершин, OR по детям
+    # в обратном топологическом порядке (подходит и для DAG)
+    desc = [0] * n
+    for v in reversed(_topological_order(children, parents)):
+        bits = 0
+        for c in children[v]:
+            bits |= desc[c] | (1 << c)
+        desc[v] = bits
+        row = r3[v]
+        while bits:
+            low = bits & -bits
+            row[low.bit_length() - 1] = True
+            bits ^= low
+
+    # r4: i – предок j тогда и только тогда, когда j – потомок i
+    for i in range(n):
+        for j in range(n):
+            if r3[i][j]:
+                r4[j][i] = True
+
+    # r5: вершины с общим родителем
+    for group in children:
         for u in group:
             for v in group:
                 if u != v:
-                    r5[vertex_to_index[u]][vertex_to_index[v]] = True
+                    r5[u][v] = True
 
+    probe.stage("matrices")
+    probe.done()
     return r1, r2, r3, r4, r5
 
+
+def _to_csr(matrix: List[List[bool]]) -> Tuple[List[int], List[int]]:
+    """
+    Переводит булеву матрицу в формат CSR: indptr (длина n + 1) и indices
+    (номера столбцов с True, построчно по возрастанию).
+    """
+    indptr = [0]
+    indices: List[int] = []
+    for row in matrix:
+        indices.extend(j for j, x in enumerate(row) if x)
+        indptr.append(len(indices))
+    return indptr, indices
+
+
+def export_relations(s: str, e: str, path: str, fmt: str = "csr") -> List[str]:
+    """
+    Считает отношения r1..r5 и сохраняет их в каталог path набором .npy-файлов,
+    которые можно открыть через np.load(..., mmap_mode="r") в нескольких
+    процессах без десериализации.
+
+    Каталог собирается во временном соседнем каталоге и затем подменяет path:
+    файлы другого формата от прошлой выгрузки не остаются, а читатели, уже
+    отобразившие старые файлы в память, продолжают видеть их целыми.
+    Подмена делается двумя переименованиями (старый каталог в сторону, новый
+    на его место), поэтому открытие path в этот короткий промежуток может дать
+    FileNotFoundError. Если второе переименование не удалось, прежний каталог
+    возвращается на место.
+
+    Args:
+        s: CSV-строка с ребрами (как в main)
+        e: Идентификатор корневого узла
+        path: Каталог для файлов (прежнее содержимое заменяется)
+        fmt: "csr" – для каждого отношения <r>_indptr.npy и <r>_indices.npy (int64);
+             "bits" – <r>_bits.npy, строки матрицы, упакованные np.packbits (uint8)
+
+    Returns:
+        Список путей к записанным файлам. Кроме отношений всегда пишутся
+        vertices.npy – имена вершин в порядке индексов матриц – и meta.json
+        с форматом и числом вершин.
+    """
+    import numpy as np
+
+    if fmt not in ("csr", "bits"):
+        raise ValueError(f"Неизвестный формат: {fmt!r} (ожидался 'csr' или 'bits')")
+
+    _, vertex_list = _parse_edges(s)
+    matrices = main(s, e)
+    n = len(vertex_list)
+
+    arrays: Dict[str, object] = {
+        "vertices": np.array(vertex_list, dtype=str),
+    }
+    for name, mat in zip(RELATION_NAMES, matrices):
+        if fmt == "csr":
+            indptr, indices = _to_csr(mat)
+            arrays[f"{name}_indptr"] = np.array(indptr, dtype=np.int64)
+            arrays[f"{name}_indices"] = np.array(indices, dtype=np.int64)
+        else:
+            dense = np.array(mat, dtype=bool).reshape(n, n)
+            arrays[f"{name}_bits"] = np.packbits(dense, axis=1)
+
+    path = os.path.abspath(path)
+    parent = os.path.dirname(path)
+    os.makedirs(parent, exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix=".tmp-", dir=parent)
+    try:
+        for key, arr in arrays.items():
+            np.save(os.path.join(tmp, f"{key}.npy"), arr)
+        meta = {"format": fmt, "n": n, "relations": list(RELATION_NAMES)}
+        with open(os.path.join(tmp, META_FILE), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+        if os.path.exists(path):
+            old = tempfile.mkdtemp(prefix=".old-", dir=parent)
+            old_data = os.path.join(old, "data")
+            os.rename(path, old_data)
+            try:
+                os.rename(tmp, path)
+            except BaseException:
+                os.rename(old_data, path)
+                os.rmdir(old)
+                raise
+            shutil.rmtree(old)
+        else:
+            os.rename(tmp, path)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+    return [os.path.join(path, f"{key}.npy") for key in arrays] + [os.path.join(path, META_FILE)]
+
+
+def load_relations(path: str, mmap_mode: str = "r") -> Dict[str, object]:
+    """
+    Открывает каталог, записанный export_relations.
+
+    Returns:
+        Словарь: "format" и "n" из meta.json, "vertices" – массив имен вершин,
+        для каждого отношения r1..r5 – кортеж (indptr, indices) для формата csr
+        или массив упакованных бит (распаковка: np.unpackbits(bits, axis=1, count=n)).
+        Массивы отображаются в память, если mmap_mode не None.
+    """
+    import numpy as np
+
+    with open(os.path.join(path, META_FILE), encoding="utf-8") as f:
+        meta = json.load(f)
+    fmt = meta["format"]
+
+    def _load(key):
+        return np.load(os.path.join(path, f"{key}.npy"), mmap_mode=mmap_mode)
+
+    result: Dict[str, object] = {
+        "format": fmt,
+        "n": meta["n"],
+        "vertices": _load("vertices"),
+    }
+    for name in meta["relations"]:
+        if fmt == "bits":
+            result[name] = _load(f"{name}_bits")
+        elif fmt == "csr":
+            result[name] = (_load(f"{name}_indptr"), _load(f"{name}_indices"))
+        else:
+            raise ValueError(f"Неизвестный формат в {META_FILE}: {fmt!r}")
+    return result
+
+
 if __name__ == "__main__":
     csv_data = "1,2\n1,3\n3,4\n3,5"
     matrices = main(csv_data, "1")
-    names = ["r1", "r2", "r3", "r4", "r5"]
-    for name, mat in zip(names, matrices):
+    for name, mat in zip(RELATION_NAMES, matrices):
         print(f"{name}:")
         for row in mat:
             print([int(x) for x in row])
@@ -1,19 +1,104 @@
-from typing import List, Tuple
+from typing import List, Set, Tuple
 import csv
 from io import StringIO
 import math
 
+# Необязательные замеры стадий main, см. tools/profiling.py.
+_profiler = None
+
+
+class _NoProbe:
+    def stage(self, name):
+        pass
+
+    def size(self, **sizes):
+        pass
+
+    def done(self):
+        pass
+
+
+_NO_PROBE = _NoProbe()
+
+
+def _topological_order(children: List[Set[int]], parents: List[Set[int]]) -> List[int]:
+    """
+    Топологический порядок вершин (алгоритм Кана).
+    """
+    indeg = [len(ps) for ps in parents]
+    order = [v for v, d in enumerate(indeg) if d == 0]
+    for v in order:
+        for c in children[v]:
+            indeg[c] -= 1
+            if indeg[c] == 0:
+                order.append(c)
+    if len(order) != len(parents):
+        raise ValueError("Граф содержит цикл: ожидалось дерево или DAG")
+    return order
+
+
+def _reachability_counts(children: List[Set[int]],
+                         parents: List[Set[int]]) -> Tuple[List[int], List[int]]:
+    """
+    Для каждой вершины считает число потомков и число предков в DAG.
+
+    Множества потомков – битовые маски (int): потомки v = OR по детям c
+    (бит c | потомки c) в обратном топологическом порядке; предки – так же
+    по родителям в прямом порядке. Бит вершины – ее место в топологическом
+    порядке (для потомков – с конца), поэтому маски вершин у листьев/корней
+    короткие. Маска освобождается, как только ее прочитали все, кому она нужна.
+    """
+    n = len(children)
+    order = _topological_order(children, parents)
+    place = [0] * n
+    for k, v in enumerate(order):
+        place[v] = k
+
+    n_desc = [0] * n
+    desc = [0] * n
+    readers = [len(ps) for ps in parents]
+    for v in reversed(order):
+        bits = 0
+        for c in children[v]:
+            bits |= desc[c] | (1 << (n - 1 - place[c]))
+            readers[c] -= 1
+            if readers[c] == 0:
+                desc[c] = 0
+        n_desc[v] = bits.bit_count()
+        if readers[v]:
+            desc[v] = bits
+
+    n_anc = [0] * n
+    anc = [0] * n
+    readers = [len(cs) for cs in children]
+    for v in order:
+        bits = 0
+        for p in parents[v]:
+            bits |= anc[p] | (1 << place[p])
+            readers[p] -= 1
+            if readers[p] == 0:
+                anc[p] = 0
+        n_anc[v] = bits.bit_count()
+        if readers[v]:
+            anc[v] = bits
+
+    return n_desc, n_anc
+
+
 def main(s: str, e: str) -> Tuple[float, float]:
     """
     Рассчитывает энтропию структуры графа и нормированную оценку структурной сложности.
     
     Args:
         s: CSV-строка с ребрами в формате "parent,child\nparent,child\n..."
+           (дерево или DAG: у вершины может быть несколько родителей)
         e: Идентификатор корневого узла
     
     Returns:
         Tuple[float, float]: (энтропия структуры, нормированная сложность), округлены до 1 знака
     """
+    probe = _profiler("task2") if _profiler is not None else _NO_PROBE
+
     reader = csv.reader(StringIO(s.strip()))
     edges = []
     vertices = set()
@@ -27,80 +112,40 @@ def main(s: str, e: str) -> Tuple[float, float]:
 
     vertex_list = sorted(vertices)
     n = len(vertex_list)
+    probe.stage("parse")
+    probe.size(n=n, edges=len(edges))
     vertex_to_index = {v: i for i, v in enumerate(vertex_list)}
 
-    # матрицы смежности (r1, r2, r3, r4, r5)
-    r1 = [[False]*n for _ in range(n)]
-    r2 = [[False]*n for _ in range(n)]
-    r3 = [[False]*n for _ in range(n)]
-    r4 = [[False]*n for _ in range(n)]
-    r5 = [[False]*n for _ in range(n)]
-
-    children = {v: [] for v in vertices}
-    parents = {v: None for v in vertices}
-    for parent, child in edges:
-        children[parent].append(child)
-        parents[child] = parent
-
-    # r1
+    # l[r][j] – число единиц в столбце j матрицы отношения r (r1..r5).
+    # Матрицы n x n не строятся: столбцы считаются по спискам смежности
+    # и битовым множествам достижимости, что работает и для DAG.
+    children = [set() for _ in range(n)]
+    parents = [set() for _ in range(n)]
     for parent, child in edges:
         i, j = vertex_to_index[parent], vertex_to_index[child]
-        r1[i][j] = True
+        children[i].add(j)
+        parents[j].add(i)
 
-    # r2
-    for parent, child in edges:
-        i, j = vertex_to_index[parent], vertex_to_index[child]
-        r2[j][i] = True
-
-    def get_all_descendants(node, visited=None):
-        if visited is None:
-            visited = set()
-        if node in visited:
-            return set()
-        visited.add(node)
-        result = set()
-        for c in children[node]:
-            result.add(c)
-            result |= get_all_descendants(c, visited)
-        return result
-
-    # r3
-    for v in vertices:
-        i = vertex_to_index[v]
-        for desc in get_all_descendants(v):
-            j = vertex_to_index[desc]
-            r3[i][j] = True
-
-    # r4
-    for v in vertices:
-        j = vertex_to_index[v]
-        curr = parents[v]
-        while curr is not None:
-            i = vertex_to_index[curr]
-            r4[j][i] = True
-            curr = parents[curr]
-
-    # r5
-    siblings = {}
-    for v in vertices:
-        p = parents[v]
-        if p is not None:
-            siblings.setdefault(p, []).append(v)
-    for group in siblings.values():
-        for u in group:
-            for v in group:
-                if u != v:
-                    r5[vertex_to_index[u]][vertex_to_index[v]] = True
-
-    # Все пять матриц
-    matrices = [r1, r2, r3, r4, r5]
+    n_desc, n_anc = _reachability_counts(children, parents)
 
     l = [[0] * n for _ in range(5)]
-    
-    for rel_idx, matrix in enumerate(matrices):
-        for j in range(n):
-            count = sum(1 for i in range(n) if matrix[i][j])
-            l[rel_idx][j] = count
+    for j in range(n):
+        # r1: i – непосредственный родитель j; столбец j – число родителей j
+        l[0][j] = len(parents[j])
+        # r2: обратное к r1; столбец j – число детей j
+        l[1][j] = len(children[j])
+        # r3: столбец j – число предков j
+        l[2][j] = n_anc[j]
+        # r4: столбец j – число потомков j
+        l[3][j] = n_desc[j]
+        # r5: вершины, имеющие с j общего родителя
+        ps = parents[j]
+        if len(ps) == 1:
+            l[4][j] = len(children[next(iter(ps))]) - 1
+        elif ps:
+            l[4][j] = len(set().union(*(children[p] for p in ps))) - 1
+    # стадия называется как до перехода на DAG, чтобы профили оставались сравнимы
+    probe.stage("matrices")
 
     k = n - 1
     
@@ -120,6 +165,8 @@ def main(s: str, e: str) -> Tuple[float, float]:
 
     entropy_rounded = round(total_entropy, 1)
     normalized_rounded = round(normalized_complexity, 1)
+    probe.stage("entropy")
+    probe.done()
 
     return (entropy_rounded, normalized_rounded)
 
@@ -1,6 +1,24 @@
 # task3/task.py
 import json
-from typing import Any, Dict, List, Set
+from bisect import bisect_left, insort
+from typing import Any, Dict, List, Set, Tuple
+
+# Необязательные замеры стадий main, см. tools/profiling.py.
+_profiler = None
+
+
+class _NoProbe:
+    def stage(self, name):
+        pass
+
+    def size(self, **sizes):
+        pass
+
+    def done(self):
+        pass
+
+
+_NO_PROBE = _NoProbe()
 
 
 def _normalize_ranking(obj: Any) -> List[List[Any]]:
@@ -35,13 +53,19 @@ def _collect_items(r1: List[List[Any]], r2: List[List[Any]]) -> List[Any]:
     for cl in r2:
         items_set.update(cl)
 
-    def _key(x: Any):
-        try:
-            return (0, int(x))
-        except Exception:
-            return (1, str(x))
+    return sorted(items_set, key=_item_key)
+
 
-    return sorted(items_set, key=_key)
+def _item_key(x: Any):
+    """
+    Ключ фиксированного порядка объектов (см. _collect_items).
+    Объекты с одинаковым значением (1, "1", "01") различаются
+    по имени типа и repr, чтобы порядок был детерминированным.
+    """
+    try:
+        return (0, int(x), type(x).__name__, repr(x))
+    except Exception:
+        return (1, str(x), type(x).__name__, repr(x))
 
 
 def _build_position_map(r: List[List[Any]]) -> Dict[Any, int]:
@@ -255,17 +279,35 @@ def main(json_rank_1: str, json_rank_2: str) -> str:
     При необходимости можно изменить в конце, чтобы возвращать только
     кластерную ранжировку (stage2["cluster_ranking"]).
     """
+    probe = _profiler("task3") if _profiler is not None else _NO_PROBE
+
     # 1. Парсим входные JSON-строки
     r1_raw = json.loads(json_rank_1)
     r2_raw = json.loads(json_rank_2)
 
     r1 = _normalize_ranking(r1_raw)
     r2 = _normalize_ranking(r2_raw)
+    probe.stage("parse")
+
+    result = _compare(r1, r2, probe)
+    probe.done()
 
+    # Если нужно возвращать только результат этапа 2, замените на:
+    # return json.dumps(result["stage2"]["cluster_ranking"], ensure_ascii=False)
+    return json.dumps(result, ensure_ascii=False)
+
+
+def _compare(r1: List[List[Any]], r2: List[List[Any]],
+             probe: Any = _NO_PROBE) -> Dict[str, Any]:
+    """
+    Шаги 2–5 алгоритма для нормализованных ранжировок (см. main).
+    Возвращает словарь {"stage1": ..., "stage2": ...}.
+    """
     # 2. Общее множество объектов и матрицы отношений YA, YB
     items = _collect_items(r1, r2)
     YA = _build_relation_matrix(items, r1)
     YB = _build_relation_matrix(items, r2)
+    probe.stage("matrices")
 
     # 3. Шаг 2 алгоритма: матрица противоречий P и ядро противоречий S(A, B)
     YA_T = _transpose(YA)
@@ -276,6 +318,7 @@ def main(json_rank_1: str, json_rank_2: str) -> str:
     P = _boolean_or(P1, P2)
 
     n = len(items)
+    probe.stage("products")
     # множество пар индексов с pij = 0 (ядро противоречий)
     core_pairs: Set[tuple[int, int]] = set()
     for i in range(n):
@@ -317,6 +360,8 @@ def main(json_rank_1: str, json_rank_2: str) -> str:
             contradiction_components.append(
                 [items[i] for i in sorted(comp_idx)]
             )
+    probe.stage("contradictions")
+    probe.size(n=n, pairs=len(core_pairs))
 
     # 4. Шаг 3: матрица согласованного порядка C = YA ◦ YB
     C = _boolean_product(YA, YB)
@@ -330,12 +375,16 @@ def main(json_rank_1: str, json_rank_2: str) -> str:
     C_T = _transpose(C)
     E = _boolean_product(C, C_T)
     E_star = _transitive_closure(E)
+    probe.stage("closure")
 
     # Кластеры – компоненты связности по E*
     components = _find_components_from_matrix(E_star)
+    probe.stage("clustering")
 
     # 6. Шаг 5: упорядочивание кластеров
     ordered_components = _build_cluster_order(components, C)
+    probe.stage("ordering")
+    probe.size(clusters=len(components))
 
     # 7. Формируем итоговую кластерную ранжировку
     cluster_ranking: List[Any] = []
@@ -347,7 +396,7 @@ def main(json_rank_1: str, json_rank_2: str) -> str:
         else:
             cluster_ranking.append(elems)
 
-    result = {
+    return {
         "stage1": {
             "contradiction_core": contradiction_components
         },
@@ -356,6 +405,236 @@ def main(json_rank_1: str, json_rank_2: str) -> str:
         }
     }
 
-    # Если нужно возвращать только результат этапа 2, замените на:
-    # return json.dumps(cluster_ranking, ensure_ascii=False)
-    return json.dumps(result, ensure_ascii=False)
+
+class _KeyedItem:
+    """
+    Обертка для хранения объектов в отсортированном списке по _item_key.
+    """
+    __slots__ = ("key", "item")
+
+    def __init__(self, item: Any):
+        self.key = _item_key(item)
+        self.item = item
+
+    def __lt__(self, other: "_KeyedItem") -> bool:
+        return self.key < other.key
+
+
+class RankingComparison:
+    """
+    Сравнение двух кластерных ранжировок с инкрементальным пересчетом
+    после небольших правок эксперта (move_item / update_ranking).
+
+    Результат result() совпадает с main(json_rank_1, json_rank_2) для
+    текущего состояния ранжировок, но матрицы n x n не строятся:
+
+    * Позиции объектов хранятся как ключи кластеров (возрастающие числа).
+      Вставка нового кластера берет ключ между соседями, поэтому остальные
+      объекты не перенумеровываются, а кластер объекта ищется бинарным поиском.
+    * Ядро противоречий всегда пусто: в p_ij = OR_k (ya_ik yb_jk) OR OR_k (ya_ki yb_kj)
+      свидетель k = i дает yb_ji OR yb_ij, а квазипорядок YB полон.
+      Поэтому перемещение объекта не создает и не снимает противоречий.
+    * Кластеры этапа 2 не зависят от порядка: в строке i матрицы C всегда есть
+      объект k с максимальной позицией в B (свидетель – сам i при j = k),
+      поэтому E = C ◦ C^T состоит из единиц и E* дает один кластер из всех объектов.
+      После правки остается только поддерживать отсортированный список объектов.
+
+    Оба свойства зависят от того, как _build_relation_matrix и _compare строят
+    матрицы; _check_shortcut сверяет упрощенный результат с _compare на
+    контрольных ранжировках (вызывается из tests/test_task3.py).
+    """
+
+    def __init__(self, json_rank_1: Any, json_rank_2: Any):
+        self._clusters: List[List[List[Any]]] = [[], []]
+        self._keys: List[List[float]] = [[], []]
+        self._pos: List[Dict[Any, float]] = [{}, {}]
+        self._items: List[_KeyedItem] = []
+
+        self._set_ranking(0, json_rank_1)
+        self._set_ranking(1, json_rank_2)
+        known: Set[Any] = set()
+        for pos in self._pos:
+            known.update(pos)
+        self._items = sorted(_KeyedItem(x) for x in known)
+
+    # ---- состояние ----
+
+    @property
+    def items(self) -> List[Any]:
+        return [k.item for k in self._items]
+
+    @property
+    def rankings(self) -> Tuple[List[List[Any]], List[List[Any]]]:
+        return self._clusters[0], self._clusters[1]
+
+    def _set_ranking(self, which: int, raw: Any) -> None:
+        if isinstance(raw, str):
+            raw = json.loads(raw)
+        clusters = _normalize_ranking(raw)
+        self._clusters[which] = clusters
+        self._keys[which] = [float(i) for i in range(len(clusters))]
+        self._pos[which] = {x: float(i) for i, x in _enumerate_items(clusters)}
+
+    # ---- правки ----
+
+    def move_item(self, which: int, item: Any, cluster: int,
+                  new_cluster: bool = False) -> None:
+        """
+        Перемещает item в ранжировке which (0 – первая, 1 – вторая).
+
+        Args:
+            cluster: индекс кластера (после удаления item из старого места,
+                     если его кластер стал пустым и исчез)
+            new_cluster: если True, item образует новый кластер, который
+                         вставляется на позицию cluster (0..len)
+        """
+        if which not in (0, 1):
+            raise ValueError("which должен быть 0 или 1")
+        clusters = self._clusters[which]
+        keys = self._keys[which]
+        pos = self._pos[which]
+
+        old_key = pos.get(item)
+        old_idx = None if old_key is None else bisect_left(keys, old_key)
+        # число кластеров после удаления item со старого места
+        size = len(clusters)
+        if old_idx is not None and len(clusters[old_idx]) == 1:
+            size -= 1
+        limit = size + 1 if new_cluster else size
+        if not 0 <= cluster < limit:
+            raise IndexError("индекс кластера вне диапазона")
+
+        if old_idx is not None:
+            clusters[old_idx].remove(item)
+            if not clusters[old_idx]:
+                del clusters[old_idx]
+                del keys[old_idx]
+
+        if new_cluster:
+            key = self._key_between(which, cluster)
+            clusters.insert(cluster, [item])
+            keys.insert(cluster, key)
+        else:
+            clusters[cluster].append(item)
+            key = keys[cluster]
+        pos[item] = key
+
+        if old_key is None and item not in self._pos[1 - which]:
+            insort(self._items, _KeyedItem(item))
+
+    def update_ranking(self, which: int, json_rank: Any) -> None:
+        """
+        Заменяет ранжировку which целиком; список объектов правится только
+        для тех, что появились или исчезли.
+        """
+        if which not in (0, 1):
+            raise ValueError("which должен быть 0 или 1")
+        old_clusters = self._clusters[which]
+        old_index = {x: i for i, x in _enumerate_items(old_clusters)}
+
+        self._set_ranking(which, json_rank)
+        new_index = {x: i for i, x in _enumerate_items(self._clusters[which])}
+
+        other = self._pos[1 - which]
+        for x in old_index.keys() ^ new_index.keys():
+            present = x in new_index or x in other
+            was_present = x in old_index or x in other
+            if present and not was_present:
+                insort(self._items, _KeyedItem(x))
+            elif was_present and not present:
+                self._remove_item(x)
+
+    def _remove_item(self, x: Any) -> None:
+        k = _KeyedItem(x)
+        i = bisect_left(self._items, k)
+        while i < len(self._items) and self._items[i].key == k.key:
+            item = self._items[i].item
+            if type(item) is type(x) and item == x:
+                del self._items[i]
+                return
+            i += 1
+
+    def _key_between(self, which: int, idx: int) -> float:
+        """
+        Ключ для нового кластера, вставляемого в ранжировку which перед idx.
+        """
+        keys = self._keys[which]
+        if not keys:
+            return 0.0
+        if idx == 0:
+            return keys[0] - 1.0
+        if idx == len(keys):
+            return keys[-1] + 1.0
+        lo, hi = keys[idx - 1], keys[idx]
+        mid = (lo + hi) / 2.0
+        if lo < mid < hi:
+            return mid
+        # ключи исчерпали точность – перенумеровываем ранжировку
+        pos = self._pos[which]
+        for i, cl in enumerate(self._clusters[which]):
+            keys[i] = float(i) if i < idx else float(i + 1)
+            for x in cl:
+                pos[x] = keys[i]
+        return float(idx)
+
+    # ---- результат ----
+
+    def result(self) -> Dict[str, Any]:
+        """
+        Результат в том же виде, что и json.loads(main(...)).
+        """
+        return _shortcut_result(self.items)
+
+    def to_json(self) -> str:
+        return json.dumps(self.result(), ensure_ascii=False)
+
+
+def _shortcut_result(items: List[Any]) -> Dict[str, Any]:
+    """
+    Результат _compare в случае, описанном в RankingComparison:
+    пустое ядро противоречий и один кластер из всех объектов.
+    """
+    cluster_ranking: List[Any] = []
+    if len(items) == 1:
+        cluster_ranking.append(items[0])
+    elif items:
+        cluster_ranking.append(items)
+
+    return {
+        "stage1": {
+            "contradiction_core": []
+        },
+        "stage2": {
+            "cluster_ranking": cluster_ranking
+        }
+    }
+
+
+# Контрольные ранжировки для _check_shortcut: обратный порядок, кластеры,
+# объекты, отсутствующие в одной из ранжировок, и одиночный объект.
+_SHORTCUT_CASES = [
+    ([1, 2, 3, 4], [4, 3, 2, 1]),
+    ([1, [2, 3], 4, [5, 6]], [[6, 5], 1, [4, 2], 3]),
+    ([1, 2, 3], [3, 4]),
+    ([["a", "b"], "c"], ["c", "a"]),
+    ([1], [1]),
+]
+
+
+def _check_shortcut() -> None:
+    for a, b in _SHORTCUT_CASES:
+        r1, r2 = _normalize_ranking(a), _normalize_ranking(b)
+        expected = _compare(r1, r2)
+        actual = _shortcut_result(_collect_items(r1, r2))
+        if expected != actual:
+            raise RuntimeError(
+                "RankingComparison: упрощение больше не совпадает с _compare "
+                f"для {a!r} / {b!r}: {actual!r} != {expected!r}"
+            )
+
+
+def _enumerate_items(clusters: List[List[Any]]):
+    for idx, cl in enumerate(clusters):
+        for x in cl:
+            yield idx, x
+
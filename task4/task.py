@@ -2,6 +2,23 @@
 import ast
 import json
 
+# Необязательные замеры стадий main, см. tools/profiling.py.
+_profiler = None
+
+
+class _NoProbe:
+    def stage(self, name):
+        pass
+
+    def size(self, **sizes):
+        pass
+
+    def done(self):
+        pass
+
+
+_NO_PROBE = _NoProbe()
+
 
 def load_data(raw):
     if isinstance(raw, (dict, list)):
@@ -78,56 +95,99 @@ def index_terms(container, var_name):
 
 
 def main(temperature_json, heating_json, rules_json, t_current):
-    temp_obj = load_data(temperature_json)
-    heat_obj = load_data(heating_json)
-    rules = load_data(rules_json)
-
-    temp_terms = index_terms(temp_obj, "температура")
-    heat_terms = index_terms(heat_obj, "уровень нагрева")
-
-    t = float(t_current)
-    mu_temp = {name: interp_membership(t, pts) for name, pts in temp_terms.items()}
-
-    grid_xs = []
-    for pts in heat_terms.values():
-        for px, _ in pts:
-            grid_xs.append(float(px))
-
-    s_min, s_max = min(grid_xs), max(grid_xs)
-    if s_max < s_min:
-        s_min, s_max = s_max, s_min
-
-    span = s_max - s_min
-    if span == 0:
-        return float(s_min)
-
-    n = 10000
-    step = span / n
-    agg = [0.0] * (n + 1)
-
-    for rule in rules:
-        ant = canon_term(rule[0])
-        cons = canon_term(rule[1])
-
-        alpha = float(mu_temp[ant])
-        if alpha <= 0.0:
-            continue
-
-        cons_pts = heat_terms[cons]
-        for i in range(n + 1):
-            s = s_min + step * i
-            mu_cons = interp_membership(s, cons_pts)
-            mu_rule = alpha if alpha < mu_cons else mu_cons
-            if mu_rule > agg[i]:
-                agg[i] = mu_rule
-
-    max_mu = max(agg) if agg else 0.0
-    eps = 1e-12
-    for i, v in enumerate(agg):
-        if v >= max_mu - eps:
-            return float(s_min + step * i)
-
-    return float(s_min)
+    probe = _profiler("task4") if _profiler is not None else _NO_PROBE
+
+    controller = Controller(temperature_json, heating_json, rules_json)
+    probe.stage("parse")
+
+    return controller.evaluate(t_current, probe)
+
+
+class Controller:
+    """
+    Разобранный регулятор: переменные и правила загружаются один раз,
+    функция принадлежности следствия на сетке считается при первом
+    срабатывании правила с этим следствием и дальше переиспользуется.
+    main – это Controller(...).evaluate(t), поэтому повторные вызовы
+    evaluate с теми же входами дают тот же результат, что и main.
+    """
+
+    def __init__(self, temperature_json, heating_json, rules_json, n=10000):
+        temp_obj = load_data(temperature_json)
+        heat_obj = load_data(heating_json)
+        self.rules = load_data(rules_json)
+
+        self.temp_terms = index_terms(temp_obj, "температура")
+        self.heat_terms = index_terms(heat_obj, "уровень нагрева")
+
+        grid_xs = []
+        for pts in self.heat_terms.values():
+            for px, _ in pts:
+                grid_xs.append(float(px))
+
+        s_min, s_max = min(grid_xs), max(grid_xs)
+        if s_max < s_min:
+            s_min, s_max = s_max, s_min
+
+        self.s_min = s_min
+        self.span = s_max - s_min
+        self.n = n
+        self.step = self.span / n
+        self._cons_grid = {}
+
+    def _consequent_grid(self, cons):
+        grid = self._cons_grid.get(cons)
+        if grid is None:
+            cons_pts = self.heat_terms[cons]
+            grid = [
+                interp_membership(self.s_min + self.step * i, cons_pts)
+                for i in range(self.n + 1)
+            ]
+            self._cons_grid[cons] = grid
+        return grid
+
+    def evaluate(self, t_current, probe=None):
+        if probe is None:
+            probe = _profiler("task4") if _profiler is not None else _NO_PROBE
+
+        t = float(t_current)
+        mu_temp = {name: interp_membership(t, pts) for name, pts in self.temp_terms.items()}
+        probe.stage("fuzzification")
+
+        if self.span == 0:
+            probe.done()
+            return float(self.s_min)
+
+        n = self.n
+        probe.size(rules=len(self.rules), terms=len(self.temp_terms) + len(self.heat_terms),
+                   grid=n + 1)
+        agg = [0.0] * (n + 1)
+
+        for rule in self.rules:
+            ant = canon_term(rule[0])
+            cons = canon_term(rule[1])
+
+            alpha = float(mu_temp[ant])
+            if alpha <= 0.0:
+                continue
+
+            agg = [
+                max(a, alpha if alpha < mu_cons else mu_cons)
+                for a, mu_cons in zip(agg, self._consequent_grid(cons))
+            ]
+        probe.stage("membership")
+
+        max_mu = max(agg) if agg else 0.0
+        eps = 1e-12
+        result = float(self.s_min)
+        for i, v in enumerate(agg):
+            if v >= max_mu - eps:
+                result = float(self.s_min + self.step * i)
+                break
+        probe.stage("defuzzification")
+        probe.done()
+
+        return result
 
 
 if __name__ == "__main__":
@@ -0,0 +1,94 @@
+import importlib.util
+import math
+import os
+import random
+
+import pytest
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _load(name):
+    spec = importlib.util.spec_from_file_location(f"{name}_task", os.path.join(_ROOT, name, "task.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+task1 = _load("task1")
+task2 = _load("task2")
+
+
+def _brute_force(edges):
+    """
+    r1..r5 по определению: транзитивное замыкание алгоритмом Уоршелла,
+    r5 – вершины с хотя бы одним общим родителем.
+    """
+    vertices = sorted({v for edge in edges for v in edge})
+    index = {v: i for i, v in enumerate(vertices)}
+    n = len(vertices)
+
+    r1 = [[False] * n for _ in range(n)]
+    for p, c in edges:
+        r1[index[p]][index[c]] = True
+    r3 = [row[:] for row in r1]
+    for k in range(n):
+        for i in range(n):
+            if r3[i][k]:
+                for j in range(n):
+                    if r3[k][j]:
+                        r3[i][j] = True
+    r2 = [[r1[j][i] for j in range(n)] for i in range(n)]
+    r4 = [[r3[j][i] for j in range(n)] for i in range(n)]
+    r5 = [[u != v and any(r1[p][u] and r1[p][v] for p in range(n)) for v in range(n)]
+          for u in range(n)]
+    return r1, r2, r3, r4, r5
+
+
+def _entropy(matrices):
+    n = len(matrices[0])
+    k = n - 1
+    total = 0.0
+    for m in matrices:
+        for j in range(n):
+            lij = sum(1 for i in range(n) if m[i][j])
+            p = lij / k if k > 0 else 0
+            if p > 0:
+                total += -p * math.log2(p)
+    h_ref = 1.0 / (math.e * math.log(2)) * n * k
+    return round(total, 1), round(total / h_ref if h_ref > 0 else 0.0, 1)
+
+
+def _random_dag(rnd):
+    n = rnd.randint(2, 25)
+    edges = set()
+    for c in range(2, n + 1):
+        for _ in range(rnd.randint(1, 3)):
+            edges.add((str(rnd.randint(1, c - 1)), str(c)))
+    return sorted(edges)
+
+
+def test_multi_parent_dags_match_brute_force():
+    rnd = random.Random(0)
+    for _ in range(300):
+        edges = _random_dag(rnd)
+        s = "\n".join(f"{p},{c}" for p, c in edges)
+        expected = _brute_force(edges)
+        assert task1.main(s, "1") == expected
+        assert task2.main(s, "1") == _entropy(expected)
+
+
+def test_diamond():
+    s = "1,2\n1,3\n2,4\n3,4"
+    r1, r2, r3, r4, r5 = task1.main(s, "1")
+    # у 4 два родителя: оба – предки, 1 тоже
+    assert [r4[3][i] for i in range(4)] == [True, True, True, False]
+    assert r5[1][2] and r5[2][1] and not any(r5[3])
+
+
+@pytest.mark.parametrize("s", ["1,2\n2,1", "1,2\n2,3\n3,1", "1,1"])
+def test_cycles_raise(s):
+    with pytest.raises(ValueError):
+        task1.main(s, "1")
+    with pytest.raises(ValueError):
+        task2.main(s, "1")
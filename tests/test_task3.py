@@ -0,0 +1,86 @@
+import importlib.util
+import json
+import os
+import random
+
+import pytest
+
+_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "task3", "task.py")
+_spec = importlib.util.spec_from_file_location("task3_task", _PATH)
+task3 = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(task3)
+
+
+def _random_ranking(rnd, items):
+    items = items[:]
+    rnd.shuffle(items)
+    out = []
+    i = 0
+    while i < len(items):
+        k = rnd.randint(1, 3)
+        cl = items[i:i + k]
+        i += k
+        out.append(cl if len(cl) > 1 else cl[0])
+    return out
+
+
+def _expected(rc):
+    r1, r2 = rc.rankings
+    return json.loads(task3.main(json.dumps(r1), json.dumps(r2)))
+
+
+def test_random_moves_match_main():
+    rnd = random.Random(1)
+    for _ in range(300):
+        n = rnd.randint(1, 12)
+        a = _random_ranking(rnd, list(range(1, n + 1)))
+        b = _random_ranking(rnd, list(range(1, rnd.randint(1, n + 2) + 1)))
+        rc = task3.RankingComparison(json.dumps(a), json.dumps(b))
+        assert rc.result() == _expected(rc)
+
+        for _ in range(8):
+            which = rnd.randint(0, 1)
+            item = rnd.randint(1, n + 3)
+            clusters = rc.rankings[which]
+            try:
+                rc.move_item(which, item, rnd.randint(0, len(clusters)),
+                             new_cluster=rnd.random() < 0.5)
+            except IndexError:
+                pass
+            assert rc.result() == _expected(rc)
+
+        rc.update_ranking(rnd.randint(0, 1), _random_ranking(rnd, list(range(1, 5))))
+        assert rc.result() == _expected(rc)
+
+
+def test_new_cluster_keys_survive_many_inserts():
+    rc = task3.RankingComparison("[1, 2, 3]", "[1, 2, 3]")
+    for i in range(200):
+        rc.move_item(0, 100 + i, 1, new_cluster=True)
+    assert rc.result() == _expected(rc)
+    moved = rc.rankings[0][1][0]
+    rc.move_item(0, moved, 0)
+    assert moved in rc.rankings[0][0]
+
+
+def test_update_removes_exact_item_among_equal_keys():
+    rc = task3.RankingComparison([1, "1", "01"], [1, "1", "01"])
+    rc.update_ranking(0, [1, "1"])
+    rc.update_ranking(1, [1, "1"])
+    assert rc.items == [1, "1"]
+    assert rc.result() == _expected(rc)
+
+
+def test_shortcut_matches_compare():
+    task3._check_shortcut()
+
+
+def test_check_shortcut_detects_changed_relation_matrix(monkeypatch):
+    def strict_order(items, ranking):
+        pos = task3._build_position_map(ranking)
+        return [[1 if i == j or pos.get(x, len(ranking)) < pos.get(y, len(ranking)) else 0
+                 for j, y in enumerate(items)] for i, x in enumerate(items)]
+
+    monkeypatch.setattr(task3, "_build_relation_matrix", strict_order)
+    with pytest.raises(RuntimeError):
+        task3._check_shortcut()
@@ -0,0 +1,4 @@
+"""
+Вспомогательные инструменты поверх task1–task4 (пакетный запуск и т.п.).
+Запуск из корня репозитория: python -m tools.<модуль>
+"""
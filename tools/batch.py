@@ -0,0 +1,236 @@
+# file: batch.py
+"""
+Пакетный анализ множества иерархий задачами task1/task2 в пуле процессов.
+
+Пример:
+    python -m tools.batch --workers 8 < inputs.jsonl > results.jsonl
+где каждая строка inputs.jsonl – {"csv": "1,2\n1,3", "root": "1"}.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import traceback
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from tools.loader import load_task
+
+DEFAULT_TASKS = ("task1", "task2")
+
+
+@dataclass
+class BatchResult:
+    """
+    Результат обработки одного входа.
+    results – значения main по задачам; errors – текст исключения по задачам,
+    упавшим на этом входе; timings – время работы main в секундах.
+    """
+    index: int
+    root: str
+    results: Dict[str, Any]
+    errors: Dict[str, str]
+    timings: Dict[str, float]
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+class InvalidInput(Exception):
+    """
+    Вход, который не удалось разобрать. Можно передать в run_batch вместо
+    пары (edge_csv, root): на его месте будет BatchResult с ошибкой "input".
+    """
+
+
+def _format_error(exc: BaseException) -> str:
+    return "".join(traceback.format_exception_only(type(exc), exc)).strip()
+
+
+def _failed(index: int, root: str, stage: str, message: str) -> BatchResult:
+    return BatchResult(index, root, {}, {stage: message}, {})
+
+
+def _run_one(index: int, item: Any, tasks: Sequence[str]) -> BatchResult:
+    if isinstance(item, Exception):
+        return _failed(index, "", "input", _format_error(item))
+    try:
+        s, e = item
+    except (TypeError, ValueError) as exc:
+        return _failed(index, "", "input", f"ожидалась пара (edge_csv, root): {exc}")
+
+    results: Dict[str, Any] = {}
+    errors: Dict[str, str] = {}
+    timings: Dict[str, float] = {}
+    for name in tasks:
+        start = time.perf_counter()
+        try:
+            results[name] = load_task(name).main(s, e)
+        except Exception as exc:
+            errors[name] = _format_error(exc)
+        timings[name] = time.perf_counter() - start
+    return BatchResult(index, e, results, errors, timings)
+
+
+def _run_chunk(chunk: List[Tuple[int, Any]], tasks: Sequence[str]) -> List[BatchResult]:
+    return [_run_one(index, item, tasks) for index, item in chunk]
+
+
+def _chunks(inputs: Iterable[Any], size: int) -> Iterator[List[Tuple[int, Any]]]:
+    it = enumerate(inputs)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _root_of(item: Any) -> str:
+    if isinstance(item, tuple) and len(item) == 2:
+        return str(item[1])
+    return ""
+
+
+def run_batch(inputs: Iterable[Any],
+              tasks: Sequence[str] = DEFAULT_TASKS,
+              workers: Optional[int] = None,
+              chunksize: int = 64) -> Iterator[BatchResult]:
+    """
+    Обрабатывает входы (edge_csv, root) в пуле из workers процессов
+    и выдает BatchResult строго в порядке входов.
+
+    Входы отправляются пачками по chunksize; одновременно в работе не больше
+    2 * workers пачек, поэтому итератор inputs читается лениво.
+    Ошибка на одном входе не прерывает пакет – она попадает в BatchResult.errors
+    (для неразобранного входа или InvalidInput – под ключом "input").
+    Если процесс пула аварийно завершился, пул создается заново, а все пачки,
+    не успевшие завершиться, считаются подозрительными: их входы выполняются
+    заново по одному, без других задач в пуле. Ошибку "pool" получает только
+    вход, на котором пул снова падает.
+    """
+    for name in tasks:
+        if name not in DEFAULT_TASKS:
+            raise ValueError(f"Пакетный режим поддерживает только {DEFAULT_TASKS}, получено {name!r}")
+    if chunksize < 1:
+        raise ValueError("chunksize должен быть >= 1")
+
+    workers = workers or os.cpu_count() or 1
+    max_pending = 2 * workers
+    tasks = tuple(tasks)
+    chunks = _chunks(inputs, chunksize)
+
+    pool = ProcessPoolExecutor(max_workers=workers)
+    # (пачка, future, пул, в который она отправлена); future = None –
+    # пачка, потерянная при сбое пула, ее входы выполняются по одному
+    pending = deque()
+
+    def replace_pool():
+        nonlocal pool
+        pool.shutdown(wait=False, cancel_futures=True)
+        pool = ProcessPoolExecutor(max_workers=workers)
+
+    def send(chunk):
+        try:
+            future = pool.submit(_run_chunk, chunk, tasks)
+        except BrokenProcessPool:
+            replace_pool()
+            future = pool.submit(_run_chunk, chunk, tasks)
+        return chunk, future, pool
+
+    def completed(entry) -> bool:
+        _, future, _ = entry
+        return future is not None and future.done() and future.exception() is None
+
+    def run_isolated(chunk) -> List[BatchResult]:
+        # в пуле в это время нет других задач, поэтому падение пула
+        # однозначно указывает на текущий вход
+        results = []
+        for entry in chunk:
+            _, future, used = send([entry])
+            try:
+                results.extend(future.result())
+            except BrokenProcessPool as exc:
+                index, item = entry
+                results.append(_failed(index, _root_of(item), "pool", _format_error(exc)))
+                if used is pool:
+                    replace_pool()
+        return results
+
+    def suspects() -> bool:
+        return any(future is None for _, future, _ in pending)
+
+    def refill():
+        while len(pending) < max_pending and not suspects():
+            nxt = next(chunks, None)
+            if nxt is None:
+                return
+            pending.append(send(nxt))
+
+    try:
+        refill()
+        while pending:
+            chunk, future, _ = pending.popleft()
+            if future is None:
+                batch = run_isolated(chunk)
+            else:
+                try:
+                    batch = future.result()
+                except BrokenProcessPool:
+                    # новый пул без чужих задач – даже если сломанный уже заменен в send
+                    replace_pool()
+                    # все незавершенные пачки, включая текущую, переходят в подозрительные
+                    pending.appendleft((chunk, None, None))
+                    pending = deque(
+                        e if completed(e) else (e[0], None, None) for e in pending
+                    )
+                    continue
+            refill()
+            yield from batch
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def write_jsonl(results: Iterable[BatchResult], out: TextIO) -> Tuple[int, int]:
+    """
+    Записывает результаты в out по одному JSON-объекту на строку.
+    Возвращает (число входов, число входов с ошибками).
+    """
+    total = failed = 0
+    for res in results:
+        out.write(json.dumps(asdict(res), ensure_ascii=False) + "\n")
+        total += 1
+        if not res.ok:
+            failed += 1
+    return total, failed
+
+
+def _read_inputs(stream: TextIO) -> Iterator[Any]:
+    for lineno, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            obj = json.loads(line)
+            yield obj["csv"], str(obj["root"])
+        except (ValueError, TypeError, KeyError) as exc:
+            yield InvalidInput(f"строка {lineno}: {_format_error(exc)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Пакетный запуск task1/task2")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunksize", type=int, default=64)
+    parser.add_argument("--tasks", default=",".join(DEFAULT_TASKS))
+    args = parser.parse_args()
+
+    total, failed = write_jsonl(
+        run_batch(_read_inputs(sys.stdin), args.tasks.split(","), args.workers, args.chunksize),
+        sys.stdout,
+    )
+    print(f"обработано: {total}, с ошибками: {failed}", file=sys.stderr)
@@ -0,0 +1,34 @@
+# file: loader.py
+import importlib.util
+import os
+import sys
+from types import ModuleType
+from typing import Dict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TASKS = ("task1", "task2", "task3", "task4")
+
+_modules: Dict[str, ModuleType] = {}
+
+
+def load_task(name: str) -> ModuleType:
+    """
+    Загружает <name>/task.py как модуль "<name>_task".
+    Все задачи лежат в файлах с одинаковым именем task.py, поэтому обычный
+    import не позволяет использовать их в одном процессе.
+    Модули кэшируются: повторный вызов возвращает уже загруженный модуль.
+    """
+    if name not in TASKS:
+        raise ValueError(f"Неизвестная задача: {name!r}")
+    module = _modules.get(name)
+    if module is not None:
+        return module
+
+    module_name = f"{name}_task"
+    path = os.path.join(ROOT, name, "task.py")
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    _modules[name] = module
+    return module
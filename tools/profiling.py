@@ -0,0 +1,179 @@
+# file: profiling.py
+"""
+Необязательные замеры стадий main в task1–task4.
+
+Каждая задача держит модульную переменную _profiler. Пока она None, main
+отмечает стадии пустым объектом и почти ничего не тратит. install() подставляет
+фабрику Probe: на каждый вызов main создается Probe, который записывает
+длительность стадий, изменение числа живых блоков памяти за стадию
+(net_blocks, разность sys.getallocatedblocks – это не число выделений:
+стадия, освободившая временные объекты, дает отрицательное значение)
+и размеры задачи, а в конце вызова передает CallRecord в callback.
+Счетчик блоков общий для процесса, поэтому при параллельных вызовах
+в потоках значения стадий смешиваются.
+
+Пример:
+    from tools.profiling import Aggregator, profiled
+    agg = Aggregator()
+    with profiled(agg):
+        load_task("task3").main(a, b)
+    agg.to_json("profile.json")
+"""
+import json
+import math
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from tools.loader import TASKS, load_task
+
+
+@dataclass
+class CallRecord:
+    """
+    Замеры одного вызова main: стадии в порядке выполнения.
+    """
+    task: str
+    stages: Dict[str, float] = field(default_factory=dict)
+    net_blocks: Dict[str, int] = field(default_factory=dict)
+    sizes: Dict[str, int] = field(default_factory=dict)
+    total_s: float = 0.0
+
+
+class Probe:
+    """
+    Записывает стадии одного вызова. Стадия длится от предыдущей отметки
+    (или начала вызова) до stage(name).
+    """
+    __slots__ = ("_record", "_callback", "_start", "_last", "_blocks")
+
+    def __init__(self, task: str, callback: Callable[[CallRecord], None]):
+        self._record = CallRecord(task)
+        self._callback = callback
+        self._blocks = sys.getallocatedblocks()
+        self._start = self._last = time.perf_counter()
+
+    def stage(self, name: str) -> None:
+        now = time.perf_counter()
+        blocks = sys.getallocatedblocks()
+        self._record.stages[name] = self._record.stages.get(name, 0.0) + (now - self._last)
+        self._record.net_blocks[name] = self._record.net_blocks.get(name, 0) + (blocks - self._blocks)
+        self._last = now
+        self._blocks = blocks
+
+    def size(self, **sizes: int) -> None:
+        self._record.sizes.update(sizes)
+
+    def done(self) -> None:
+        self._record.total_s = time.perf_counter() - self._start
+        self._callback(self._record)
+
+
+class Histogram:
+    """
+    Гистограмма длительностей с логарифмическими корзинами:
+    корзина k >= 0 содержит значения в [2^k, 2^(k+1)) микросекунд,
+    корзина -1 – значения меньше 1 мкс (в to_dict ключ "0").
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self.buckets: Dict[int, int] = {}
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        us = seconds * 1e6
+        k = int(math.floor(math.log2(us))) if us >= 1.0 else -1
+        self.buckets[k] = self.buckets.get(k, 0) + 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_s": self.total,
+            "mean_s": self.total / self.count if self.count else 0.0,
+            "min_s": self.min if self.count else 0.0,
+            "max_s": self.max,
+            "buckets_us": {("0" if k < 0 else str(2 ** k)): c
+                           for k, c in sorted(self.buckets.items())},
+        }
+
+
+class Aggregator:
+    """
+    Callback для install(): копит гистограммы по (задача, стадия), сумму
+    net_blocks и последние размеры задачи. Потокобезопасен.
+    """
+
+    def __init__(self, keep_records: bool = False):
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, str], Histogram] = {}
+        self._net_blocks: Dict[Tuple[str, str], int] = {}
+        self._sizes: Dict[str, Dict[str, int]] = {}
+        self.records: Optional[List[CallRecord]] = [] if keep_records else None
+
+    def __call__(self, record: CallRecord) -> None:
+        with self._lock:
+            items = list(record.stages.items()) + [("total", record.total_s)]
+            for stage, seconds in items:
+                key = (record.task, stage)
+                hist = self._histograms.get(key)
+                if hist is None:
+                    hist = self._histograms[key] = Histogram()
+                hist.add(seconds)
+            for stage, blocks in record.net_blocks.items():
+                key = (record.task, stage)
+                self._net_blocks[key] = self._net_blocks.get(key, 0) + blocks
+            self._sizes[record.task] = dict(record.sizes)
+            if self.records is not None:
+                self.records.append(record)
+
+    def export(self) -> Dict[str, Any]:
+        with self._lock:
+            result: Dict[str, Any] = {}
+            for (task, stage), hist in self._histograms.items():
+                entry = result.setdefault(task, {"stages": {}, "last_sizes": self._sizes.get(task, {})})
+                data = hist.to_dict()
+                if (task, stage) in self._net_blocks:
+                    data["net_blocks"] = self._net_blocks[(task, stage)]
+                entry["stages"][stage] = data
+            return result
+
+    def to_json(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.export(), f, ensure_ascii=False, indent=2)
+
+
+def install(callback: Callable[[CallRecord], None], tasks: Sequence[str] = TASKS) -> None:
+    """
+    Включает замеры для задач tasks: каждый завершенный вызов main
+    передается в callback(CallRecord).
+    """
+    def factory(task: str) -> Probe:
+        return Probe(task, callback)
+
+    for name in tasks:
+        load_task(name)._profiler = factory
+
+
+def uninstall(tasks: Sequence[str] = TASKS) -> None:
+    for name in tasks:
+        load_task(name)._profiler = None
+
+
+@contextmanager
+def profiled(callback: Callable[[CallRecord], None],
+             tasks: Sequence[str] = TASKS) -> Iterator[Callable[[CallRecord], None]]:
+    install(callback, tasks)
+    try:
+        yield callback
+    finally:
+        uninstall(tasks)
@@ -0,0 +1,363 @@
+# file: worker.py
+"""
+Постоянный рабочий процесс для task1–task4 с протоколом JSON-lines.
+
+Запрос (одна строка):
+    {"id": 1, "task": "task2", "args": ["1,2\n1,3", "1"]}
+Ответ (одна строка, порядок ответов может не совпадать с порядком запросов):
+    {"id": 1, "ok": true, "result": [2.0, 0.3], "elapsed_s": 0.0001}
+    {"id": 2, "ok": false, "error": "KeyError: 'x'"}
+
+Запуск:
+    python -m tools.worker                      # stdin -> stdout
+    python -m tools.worker --socket /tmp/w.sock # Unix-сокет, соединений может быть много
+
+Результаты task1–task3 кэшируются по аргументам (main детерминированы),
+для task4 – Controller по переменным и правилам. Оба кэша – LRU, ограничены
+числом записей и примерным объемом в байтах. В режиме --pool process у каждого
+процесса пула свои кэши; если процесс пула аварийно завершился, пул создается
+заново, а запросы, попавшие под сбой, получают ответ с ошибкой.
+"""
+import argparse
+import json
+import os
+import socketserver
+import stat
+import sys
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Hashable, Optional, TextIO, Tuple
+
+from tools.loader import TASKS, load_task
+
+DEFAULT_CACHE_SIZE = 256
+DEFAULT_CACHE_BYTES = 64 * 2 ** 20
+
+
+def approx_size(obj: Any) -> int:
+    """
+    Примерный объем результата в байтах: sys.getsizeof контейнеров и их
+    элементов. bool и None – общие объекты, их размер не учитывается.
+    """
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (list, tuple)):
+        for x in obj:
+            if isinstance(x, (list, tuple, dict)):
+                size += approx_size(x)
+            elif x is not None and not isinstance(x, bool):
+                size += sys.getsizeof(x)
+    elif isinstance(obj, dict):
+        for k, v in obj.items():
+            size += approx_size(k) + approx_size(v)
+    return size
+
+
+class LRUCache:
+    """
+    Потокобезопасный LRU-кэш. Ограничен числом записей maxsize и, если задан
+    max_bytes, суммарным объемом значений по функции sizeof.
+    Значение больше max_bytes не кэшируется.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE, max_bytes: Optional[int] = None,
+                 sizeof: Callable[[Any], int] = approx_size):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+        # считаем вне блокировки: параллельный промах по тому же ключу
+        # лишь повторит работу
+        value = factory()
+        size = self._sizeof(value) if self.max_bytes is not None else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            return value
+        with self._lock:
+            if key in self._data:
+                self._bytes -= self._sizes[key]
+            self._data[key] = value
+            self._sizes[key] = size
+            self._bytes += size
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                old_key, _ = self._data.popitem(last=False)
+                self._bytes -= self._sizes.pop(old_key)
+        return value
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._data), "bytes": self._bytes,
+                    "hits": self.hits, "misses": self.misses}
+
+
+def controller_size(controller: Any) -> int:
+    """
+    Верхняя оценка объема Controller: сетки следствий заполняются по мере
+    срабатывания правил, максимум – n + 1 чисел float (~32 байта со ссылкой)
+    на каждый терм нагрева.
+    """
+    return len(controller.heat_terms) * (controller.n + 1) * 32
+
+
+_results = LRUCache(max_bytes=DEFAULT_CACHE_BYTES)
+_controllers = LRUCache(max_bytes=DEFAULT_CACHE_BYTES, sizeof=controller_size)
+
+
+def _key(obj: Any) -> str:
+    """
+    Хэшируемый ключ для аргументов-словарей/списков (task4 принимает и их).
+    """
+    if isinstance(obj, str):
+        return obj
+    return json.dumps(obj, ensure_ascii=False, sort_keys=True)
+
+
+def _dispatch(task: str, args: list) -> Any:
+    if task not in TASKS:
+        raise ValueError(f"Неизвестная задача: {task!r}")
+    module = load_task(task)
+
+    if task == "task4":
+        *spec, t_current = args
+        controller = _controllers.get_or_create(
+            tuple(_key(x) for x in spec), lambda: module.Controller(*spec)
+        )
+        return controller.evaluate(t_current)
+
+    return _results.get_or_create((task,) + tuple(_key(x) for x in args),
+                                  lambda: module.main(*args))
+
+
+def handle(request: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Выполняет один запрос и возвращает ответ; исключения превращаются
+    в {"ok": false, "error": ...}.
+    """
+    req_id = request.get("id")
+    start = time.perf_counter()
+    try:
+        if request.get("task") == "stats":
+            result: Any = {"results": _results.stats(), "controllers": _controllers.stats(),
+                           "pid": os.getpid()}
+        else:
+            result = _dispatch(request["task"], list(request.get("args", [])))
+    except Exception as exc:
+        return {
+            "id": req_id,
+            "ok": False,
+            "error": "".join(traceback.format_exception_only(type(exc), exc)).strip(),
+        }
+    return {"id": req_id, "ok": True, "result": result,
+            "elapsed_s": time.perf_counter() - start}
+
+
+def _init_worker(cache_size: int, cache_bytes: int = DEFAULT_CACHE_BYTES) -> None:
+    _results.maxsize = _controllers.maxsize = cache_size
+    _results.max_bytes = _controllers.max_bytes = cache_bytes
+    for name in TASKS:
+        load_task(name)
+
+
+def make_executor(kind: str, workers: int, cache_size: int = DEFAULT_CACHE_SIZE,
+                  cache_bytes: int = DEFAULT_CACHE_BYTES) -> Executor:
+    if kind == "thread":
+        return ThreadPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                  initargs=(cache_size, cache_bytes))
+    if kind == "process":
+        return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                   initargs=(cache_size, cache_bytes))
+    raise ValueError(f"Неизвестный тип пула: {kind!r}")
+
+
+class WorkerPool:
+    """
+    Пул исполнителей, общий для всех сессий. Если процесс ProcessPoolExecutor
+    аварийно завершился, пул становится непригодным – тогда он пересоздается
+    (один раз на каждый сломанный экземпляр, под блокировкой).
+    """
+
+    def __init__(self, kind: str, workers: int, cache_size: int = DEFAULT_CACHE_SIZE,
+                 cache_bytes: int = DEFAULT_CACHE_BYTES):
+        self._args = (kind, workers, cache_size, cache_bytes)
+        self._lock = threading.Lock()
+        self._executor = make_executor(*self._args)
+
+    def submit(self, fn: Callable, *args: Any) -> Tuple[Future, Executor]:
+        """
+        Отправляет задачу; возвращает future и исполнитель, которому она ушла.
+        """
+        with self._lock:
+            executor = self._executor
+        try:
+            return executor.submit(fn, *args), executor
+        except BrokenProcessPool:
+            executor = self.replace(executor)
+            return executor.submit(fn, *args), executor
+
+    def replace(self, broken: Executor) -> Executor:
+        """
+        Пересоздает пул, если текущий – это broken; возвращает текущий пул.
+        """
+        with self._lock:
+            if self._executor is broken:
+                broken.shutdown(wait=False, cancel_futures=True)
+                self._executor = make_executor(*self._args)
+            return self._executor
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._executor.shutdown()
+
+    def __enter__(self) -> "WorkerPool":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.shutdown()
+
+
+class _Session:
+    """
+    Один поток запросов: разбирает строки, отправляет их в пул и пишет
+    ответы по мере готовности.
+    """
+
+    def __init__(self, pool: WorkerPool, write: Callable[[str], None]):
+        self._pool = pool
+        self._write = write
+        self._lock = threading.Lock()
+        # число принятых запросов, ответ на которые еще не записан
+        self._outstanding = 0
+        self._idle = threading.Condition()
+
+    def _send(self, response: Dict[str, Any]) -> None:
+        line = json.dumps(response, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._write(line)
+
+    def _finish(self) -> None:
+        with self._idle:
+            self._outstanding -= 1
+            if self._outstanding == 0:
+                self._idle.notify_all()
+
+    def _on_done(self, req_id: Any, executor: Executor, future: Future) -> None:
+        try:
+            try:
+                response = future.result()
+            except Exception as exc:
+                # сбой пула (например, упавший процесс), а не задачи
+                if isinstance(exc, BrokenProcessPool):
+                    self._pool.replace(executor)
+                response = {"id": req_id, "ok": False, "error": f"{type(exc).__name__}: {exc}"}
+            self._send(response)
+        finally:
+            self._finish()
+
+    def submit_line(self, line: str) -> None:
+        line = line.strip()
+        if not line:
+            return
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("запрос должен быть JSON-объектом")
+        except ValueError as exc:
+            self._send({"id": None, "ok": False, "error": f"Некорректный запрос: {exc}"})
+            return
+        req_id = request.get("id")
+        with self._idle:
+            self._outstanding += 1
+        try:
+            future, executor = self._pool.submit(handle, request)
+        except Exception as exc:
+            self._send({"id": req_id, "ok": False, "error": f"{type(exc).__name__}: {exc}"})
+            self._finish()
+            return
+        future.add_done_callback(lambda f: self._on_done(req_id, executor, f))
+
+    def drain(self) -> None:
+        """
+        Ждет, пока ответы на все принятые запросы будут записаны.
+        """
+        with self._idle:
+            self._idle.wait_for(lambda: self._outstanding == 0)
+
+
+def serve_stream(pool: WorkerPool, stream_in: TextIO, stream_out: TextIO) -> None:
+    def write(line: str) -> None:
+        stream_out.write(line)
+        stream_out.flush()
+
+    session = _Session(pool, write)
+    for line in stream_in:
+        session.submit_line(line)
+    session.drain()
+
+
+def serve_socket(pool: WorkerPool, path: str) -> None:
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            session = _Session(pool, self._write)
+            for raw in self.rfile:
+                session.submit_line(raw.decode("utf-8"))
+            session.drain()
+
+        def _write(self, line: str) -> None:
+            try:
+                self.wfile.write(line.encode("utf-8"))
+                self.wfile.flush()
+            except OSError:
+                # клиент закрыл соединение – ответ некуда отправить
+                pass
+
+    # удаляем только оставшийся от прошлого запуска сокет, а не что угодно по этому пути
+    if os.path.lexists(path):
+        if not stat.S_ISSOCK(os.lstat(path).st_mode):
+            raise FileExistsError(f"{path} существует и не является сокетом")
+        os.unlink(path)
+    with socketserver.ThreadingUnixStreamServer(path, Handler) as server:
+        server.daemon_threads = True
+        try:
+            server.serve_forever()
+        finally:
+            os.unlink(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="JSON-lines воркер для task1–task4")
+    parser.add_argument("--socket", help="путь Unix-сокета (по умолчанию stdin/stdout)")
+    parser.add_argument("--pool", choices=("thread", "process"), default="process")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE,
+                        help="максимум записей в каждом кэше")
+    parser.add_argument("--cache-mb", type=float, default=DEFAULT_CACHE_BYTES / 2 ** 20,
+                        help="примерный максимум объема каждого кэша, МБ")
+    args = parser.parse_args()
+
+    with WorkerPool(args.pool, args.workers, args.cache_size,
+                    int(args.cache_mb * 2 ** 20)) as pool:
+        if args.socket:
+            try:
+                serve_socket(pool, args.socket)
+            except KeyboardInterrupt:
+                pass
+        else:
+            serve_stream(pool, sys.stdin, sys.stdout)